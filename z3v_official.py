@@ -9,9 +9,17 @@ ZetaLvX custom script (batch/single) for Hunyuan3D-2.1 shape + paint.
 """
 
 import os
+import re
 import sys
+import enum
+import io
+import json
 import types
+import contextlib
+import struct
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # -----------------------------
@@ -20,6 +28,16 @@ from pathlib import Path
 MODEL_PATH = "/path/to/hy3d/models/Hunyuan3D-2.1"  # folder containing hunyuan3d-dit-v2-1 etc.
 MAX_NUM_VIEW = 8        # typical range: 6..12 (higher => more VRAM)
 RESOLUTION = 512        # typical: 512 or 768 (higher => more VRAM)
+TRT_CACHE_DIRNAME = "trt_cache"  # TensorRT engines (--trt) are cached here, next to the script
+PIPELINE_CACHE_DIRNAME = "cache"  # pickled pipelines (--cache-pipelines), next to the script
+SERVER_SOCKET_NAME = "hy3d_server.sock"  # UNIX socket for --server / --submit, next to the script
+
+# -----------------------------
+# CUDA ALLOCATOR (must be set before torch is imported)
+# -----------------------------
+# Growable segments + capped block splitting: the paint peak is reused across images instead of
+# fragmenting the cache. An explicit PYTORCH_CUDA_ALLOC_CONF from the environment wins.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512")
 
 # -----------------------------
 # SAFE "BYPASS" FOR bpy IMPORTS
@@ -36,6 +54,55 @@ HY3DPAINT_DIR = (SCRIPT_DIR / "hy3dpaint").resolve()
 sys.path.insert(0, str(HY3DSHAPE_DIR))
 sys.path.insert(0, str(HY3DPAINT_DIR))
 
+# -----------------------------
+# LIGHTWEIGHT CLIENT (--submit)
+# -----------------------------
+# A --submit client only talks to a running --server: it is handled here, before torch and the
+# upstream pipelines are imported, so each submit starts in a fraction of a second.
+def submit(image_path: Path) -> bool:
+    """Send one image to a running --server and print the result paths."""
+    from multiprocessing.connection import Client
+
+    socket_path = SCRIPT_DIR / SERVER_SOCKET_NAME
+    try:
+        conn = Client(str(socket_path), family="AF_UNIX")
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"[ERROR] No server listening on {socket_path}. Start one with --server.")
+        return False
+    with conn:
+        conn.send({"image_path": str(image_path)})
+        response = conn.recv()
+
+    if response.get("error"):
+        print(f"[ERROR] {response['error']}")
+    for result in response.get("results", []):
+        if result["error"]:
+            print(f"[ERROR] Failed on {Path(result['image']).name}: {result['error']}")
+        if result["shape"]:
+            print(f"[OK] Shape:    {result['shape']}")
+        if result["textured"]:
+            print(f"[OK] Textured: {result['textured']}")
+    return bool(response.get("ok"))
+
+
+def run_submit(image: str) -> int:
+    """--submit entry point; returns the process exit code."""
+    target = Path(image).expanduser().resolve()
+    if not target.is_file():
+        print(f"[ERROR] --submit file not found: {target}")
+        return 1
+    return 0 if submit(target) else 1
+
+
+if __name__ == "__main__":
+    _client = argparse.ArgumentParser(add_help=False)
+    _client.add_argument("--submit", default=None)
+    _submit_image = _client.parse_known_args()[0].submit
+    if _submit_image:
+        sys.exit(run_submit(_submit_image))
+
+import numpy as np
+import torch
 from PIL import Image
 from hy3dshape.rembg import BackgroundRemover
 from hy3dshape.pipelines import Hunyuan3DDiTFlowMatchingPipeline
@@ -51,50 +118,708 @@ except Exception as e:
 
 from textureGenPipeline import Hunyuan3DPaintPipeline, Hunyuan3DPaintConfig
 
+def _fast_obj_to_glb(obj_path, glb_path) -> bool:
+    """
+    Vectorized OBJ -> GLB writer (no per-triangle Python loop, no trimesh round-trip).
+
+    Handles triangle meshes with optional UVs and a single material: Kd color, map_Kd texture and
+    the map_Pm / map_Pr maps of the PBR paint output (packed into metallicRoughnessTexture).
+    Returns False (caller falls back to trimesh) for anything else: polygons, negative indices,
+    several materials, normal/bump or other maps.
+    """
+    obj_path = Path(obj_path)
+    data = obj_path.read_bytes()
+
+    def _rows(prefix: bytes):
+        return re.findall(rb"^" + prefix + rb"[ \t]+([^\r\n]*)", data, re.MULTILINE)
+
+    def _floats(lines, width):
+        values = np.fromstring(b" ".join(lines).decode(), dtype=np.float64, sep=" ")
+        if not lines or values.size % len(lines):
+            return None
+        return values.reshape(len(lines), -1)[:, :width].astype(np.float32)
+
+    v_lines, f_lines = _rows(b"v"), _rows(b"f")
+    if not v_lines or not f_lines or len(_rows(b"usemtl")) > 1:
+        return False
+    positions = _floats(v_lines, 3)
+    if positions is None:
+        return False
+
+    # Corners are "v", "v/vt", "v/vt/vn" or "v//vn" (-> "v/0/vn"); all faces must share the layout
+    faces = b" ".join(f_lines).replace(b"//", b"/0/")
+    per_corner = f_lines[0].split()[0].replace(b"//", b"/0/").count(b"/") + 1
+    idx = np.fromstring(faces.replace(b"/", b" ").decode(), dtype=np.int64, sep=" ")
+    if idx.size != len(f_lines) * 3 * per_corner:
+        return False
+    idx = idx.reshape(-1, 3, per_corner) - 1
+    if idx.min() < -1 or idx[..., 0].min() < 0 or idx[..., 0].max() >= len(positions):
+        return False
+    v_idx = idx[..., 0]
+
+    # Material: Kd color, base-color texture and the paint PBR maps (map_Pm / map_Pr)
+    material = texture = mr_texture = None
+    mtllib = _rows(b"mtllib")
+    if mtllib:
+        mtl_path = obj_path.parent / mtllib[0].decode().strip()
+        mtl = {}
+        for line in mtl_path.read_text(errors="replace").splitlines():
+            parts = line.split(None, 1)
+            if len(parts) < 2 or parts[0].startswith("#") or parts[0] == "newmtl":
+                continue
+            key, value = parts[0].lower(), parts[1].strip()
+            is_map = key.startswith("map_") or key in ("bump", "norm", "disp")
+            if key in mtl or is_map and (key not in ("map_kd", "map_pm", "map_pr") or value.startswith("-")):
+                return False  # several materials, normal/other maps or map options: use trimesh
+            mtl[key] = value
+
+        # Same factors trimesh derives: Kd -> baseColorFactor, Ns -> roughness when there is no Pr
+        kd = [float(x) for x in mtl.get("kd", "1 1 1").split()[:3]]
+        roughness = (2.0 / (float(mtl["ns"]) + 2.0)) ** 0.25 if "ns" in mtl else 1.0
+        material = {
+            "baseColorFactor": (kd * 3)[:3] + [1.0],
+            "metallicFactor": float(mtl.get("pm", 1.0 if "map_pm" in mtl else 0.0)),
+            "roughnessFactor": float(mtl.get("pr", 1.0 if "map_pr" in mtl else roughness)),
+        }
+        if "map_kd" in mtl:
+            tex_path = mtl_path.parent / mtl["map_kd"]
+            mime = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}.get(tex_path.suffix.lower())
+            if mime is None:
+                return False
+            texture = (tex_path.read_bytes(), mime)
+        if "map_pm" in mtl or "map_pr" in mtl:
+            # glTF packs both into one texture: G = roughness, B = metallic (a missing map reads 1.0,
+            # so its factor alone applies)
+            planes = {
+                k: Image.open(mtl_path.parent / mtl[k]).convert("L") for k in ("map_pr", "map_pm") if k in mtl
+            }
+            size = next(iter(planes.values())).size
+            planes = {k: p if p.size == size else p.resize(size, Image.BILINEAR) for k, p in planes.items()}
+            full = Image.new("L", size, 255)
+            packed = Image.merge("RGB", (full, planes.get("map_pr", full), planes.get("map_pm", full)))
+            buf = io.BytesIO()
+            packed.save(buf, format="PNG", compress_level=1)
+            mr_texture = (buf.getvalue(), "image/png")
+
+    def _unit(vectors):
+        # glTF requires unit-length NORMALs: zero vectors (degenerate faces, bad vn) get +Z
+        length = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = np.where(length > 1e-12, vectors / np.maximum(length, 1e-12), (0.0, 0.0, 1.0))
+        return unit.astype(np.float32)
+
+    tex_coords = obj_normals = None
+    vt_lines, vn_lines = _rows(b"vt"), _rows(b"vn")
+    if per_corner >= 2 and vt_lines and idx[..., 1].min() >= 0:
+        tex_coords = _floats(vt_lines, 2)
+        if tex_coords is None or idx[..., 1].max() >= len(tex_coords):
+            return False
+    if per_corner == 3 and vn_lines and idx[..., 2].min() >= 0:
+        # Every corner references a normal: keep the OBJ's own shading
+        obj_normals = _floats(vn_lines, 3)
+        if obj_normals is None or idx[..., 2].max() >= len(obj_normals):
+            return False
+
+    # glTF needs one index per vertex: split vertices on unique (position, uv, normal) corners
+    columns = [0] + ([1] if tex_coords is not None else []) + ([2] if obj_normals is not None else [])
+    corners, inverse = np.unique(idx[..., columns].reshape(-1, len(columns)), axis=0, return_inverse=True)
+    indices = inverse.reshape(-1).astype(np.uint32)
+    vertex = corners[:, 0]
+
+    if obj_normals is not None:
+        normals = _unit(obj_normals[corners[:, -1]])
+    else:
+        # Smooth vertex normals, accumulated per OBJ vertex (so UV seams don't split them)
+        tri = positions[v_idx]
+        face_n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+        smooth = np.stack(
+            [np.bincount(v_idx.ravel(), np.repeat(face_n[:, k], 3), len(positions)) for k in range(3)],
+            axis=1,
+        )
+        normals = _unit(smooth)[vertex]
+    positions = positions[vertex]
+
+    uvs = None
+    if tex_coords is not None:
+        uvs = tex_coords[corners[:, 1]]
+        uvs[:, 1] = 1.0 - uvs[:, 1]  # OBJ origin is bottom-left, glTF top-left
+
+    # BIN chunk: one 4-byte aligned bufferView per array
+    blobs, views = [], []
+
+    def _add_view(blob: bytes, target=None) -> int:
+        view = {"buffer": 0, "byteOffset": sum(len(b) for b in blobs), "byteLength": len(blob)}
+        if target:
+            view["target"] = target
+        views.append(view)
+        blobs.append(blob + b"\0" * ((-len(blob)) % 4))
+        return len(views) - 1
+
+    accessors = [
+        {"bufferView": _add_view(positions.tobytes(), 34962), "componentType": 5126,
+         "count": len(positions), "type": "VEC3",
+         "min": positions.min(axis=0).tolist(), "max": positions.max(axis=0).tolist()},
+        {"bufferView": _add_view(normals.tobytes(), 34962), "componentType": 5126,
+         "count": len(normals), "type": "VEC3"},
+        {"bufferView": _add_view(indices.tobytes(), 34963), "componentType": 5125,
+         "count": len(indices), "type": "SCALAR"},
+    ]
+    primitive = {"attributes": {"POSITION": 0, "NORMAL": 1}, "indices": 2, "mode": 4}
+    gltf = {
+        "asset": {"version": "2.0", "generator": "z3v_official"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [{"primitives": [primitive]}],
+        "accessors": accessors,
+        "bufferViews": views,
+    }
+    if material is not None:
+        primitive["material"] = 0
+        gltf["materials"] = [{"pbrMetallicRoughness": material}]
+
+    if uvs is not None:
+        accessors.append({"bufferView": _add_view(uvs.tobytes(), 34962), "componentType": 5126,
+                          "count": len(uvs), "type": "VEC2"})
+        primitive["attributes"]["TEXCOORD_0"] = len(accessors) - 1
+        for slot, tex in (("baseColorTexture", texture), ("metallicRoughnessTexture", mr_texture)):
+            if tex:
+                images = gltf.setdefault("images", [])
+                images.append({"bufferView": _add_view(tex[0]), "mimeType": tex[1]})
+                gltf.setdefault("textures", []).append({"source": len(images) - 1, "sampler": 0})
+                gltf["samplers"] = [{}]
+                material[slot] = {"index": len(images) - 1}
+
+    binary = b"".join(blobs)
+    gltf["buffers"] = [{"byteLength": len(binary)}]
+
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode()
+    json_chunk += b" " * ((-len(json_chunk)) % 4)
+    with open(glb_path, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(json_chunk) + 8 + len(binary)))
+        f.write(struct.pack("<I4s", len(json_chunk), b"JSON") + json_chunk)
+        f.write(struct.pack("<I4s", len(binary), b"BIN\0") + binary)
+    return True
+
+
 # Optional: patch convert_obj_to_glb to avoid Blender dependency (kept for safety)
 try:
     from DifferentiableRenderer import mesh_utils
     import trimesh
 
     def _convert_obj_to_glb_headless(obj_path, glb_path):
+        try:
+            if _fast_obj_to_glb(obj_path, glb_path):
+                return glb_path
+        except Exception as e:
+            print(f"[WARN] Fast OBJ->GLB writer failed, using trimesh: {e}")
         mesh = trimesh.load(obj_path, force="mesh")
         mesh.export(glb_path)
         return glb_path
 
     mesh_utils.convert_obj_to_glb = _convert_obj_to_glb_headless
-    print("[OK] Patched convert_obj_to_glb to trimesh (no bpy).")
+    print("[OK] Patched convert_obj_to_glb to a headless writer (numpy fast path, trimesh fallback; no bpy).")
 except Exception as e:
     print(f"[WARN] Could not patch convert_obj_to_glb (may still be ok): {e}")
 
 
-def is_valid_glb(path: Path) -> bool:
-    """Quick signature check for GLB (starts with b'glTF')."""
+# -----------------------------
+# OPTIONAL TensorRT ACCELERATION (--trt)
+# -----------------------------
+def _paint_unet_owner(paint_pipeline):
+    """Return the diffusers pipeline that owns the paint multiview UNet/VAE (or None)."""
+    models = getattr(paint_pipeline, "models", {}) or {}
+    mv = models.get("multiview_model") or models.get("multiview")
+    return getattr(mv, "pipeline", None)
+
+
+def _paint_modules(paint_pipeline):
+    """Yield (name, module) for the torch modules of the paint multiview pipeline (UNet, VAE)."""
+    owner = _paint_unet_owner(paint_pipeline)
+    for name in ("unet", "vae"):
+        module = getattr(owner, name, None)
+        if isinstance(module, torch.nn.Module):
+            yield name, module
+
+
+def enable_fp16_channels_last(pipeline_shapegen, paint_pipeline) -> None:
+    """Cast the paint UNet/VAE and the shape DiT to fp16; paint 2D convs use channels-last."""
+    for name, module in _paint_modules(paint_pipeline):
+        module.half().to(memory_format=torch.channels_last)
+        module.eval()
+        print(f"[OK] Paint {name}: fp16 + channels_last")
+
+    # The shape DiT is transformer-only (no 2D convs), so channels-last does not apply.
+    # The shape VAE keeps the dtype chosen by from_pretrained (fp16 upstream).
+    model = getattr(pipeline_shapegen, "model", None)
+    if isinstance(model, torch.nn.Module):
+        model.half()
+        model.eval()
+        print("[OK] Shape DiT: fp16")
+
+
+# A quantized Linear is kept only if its output stays this close to fp16 (relative MSE)
+QUANT_MAX_REL_MSE = 5e-3
+
+
+def quantize_paint_unet(paint_pipeline, mode: str) -> None:
+    """
+    Weight-only quantize (torchao) the nn.Linear layers of the paint multiview UNet: fp8 on
+    Ada/Hopper, int8 otherwise. Activations, attention softmax and the VAE stay fp16.
+    Each layer is checked against its fp16 output on a random probe and reverted if it drifts.
+    """
     try:
-        with path.open("rb") as f:
-            return f.read(4) == b"glTF"
-    except Exception:
-        return False
+        from torchao.quantization import quantize_
+    except ImportError:
+        print("[WARN] --quant requested but torchao is not installed, keeping fp16.")
+        return
+    try:
+        from torchao.quantization import Float8WeightOnlyConfig, Int8WeightOnlyConfig
+        configs = {"fp8": Float8WeightOnlyConfig, "int8": Int8WeightOnlyConfig}
+    except ImportError:  # torchao < 0.9
+        from torchao.quantization import float8_weight_only, int8_weight_only
+        configs = {"fp8": float8_weight_only, "int8": int8_weight_only}
+
+    if mode == "fp8" and torch.cuda.get_device_capability() < (8, 9):
+        print("[WARN] FP8 needs an Ada/Hopper GPU (sm_89+), using int8 instead.")
+        mode = "int8"
+
+    unet = getattr(_paint_unet_owner(paint_pipeline), "unet", None)
+    if not isinstance(unet, torch.nn.Module):
+        print("[WARN] Paint multiview UNet not found, --quant ignored.")
+        return
+
+    kept = reverted = 0
+    with torch.no_grad():
+        for layer in list(unet.modules()):
+            if not isinstance(layer, torch.nn.Linear):
+                continue
+            weight = layer.weight
+            probe = torch.randn(16, layer.in_features, device=weight.device, dtype=weight.dtype)
+            ref = layer(probe).float()
+            quantize_(layer, configs[mode]())
+            err = (layer(probe).float() - ref).pow(2).mean() / ref.pow(2).mean().clamp_min(1e-12)
+            if err.item() <= QUANT_MAX_REL_MSE:
+                kept += 1
+            else:
+                layer.weight = weight
+                reverted += 1
+    print(f"[OK] Paint UNet {mode} weight-only: {kept} Linear layers quantized, {reverted} kept in fp16.")
+
+
+# -----------------------------
+# FUSED ATTENTION (SDPA / optional SageAttention)
+# -----------------------------
+_ORIG_SDPA = torch.nn.functional.scaled_dot_product_attention
+_SAGEATTN = None        # sageattention.sageattn when --sage is enabled
+_SAGE_DEPTH = 0         # > 0 while inside the shape DiT forward (sage is DiT-only)
+
+
+def _sage_sdpa(query, key, value, attn_mask=None, dropout_p=0.0, is_causal=False, **kwargs):
+    """scaled_dot_product_attention that uses SageAttention inside the shape DiT when it can."""
+    if (
+        _SAGEATTN is not None
+        and _SAGE_DEPTH > 0
+        and attn_mask is None
+        and dropout_p == 0.0
+        and not kwargs.get("enable_gqa", False)
+        and query.dim() == 4
+        and query.dtype in (torch.float16, torch.bfloat16)
+        and query.shape[-1] in (64, 128)
+    ):
+        return _SAGEATTN(
+            query, key, value, tensor_layout="HND", is_causal=is_causal, sm_scale=kwargs.get("scale")
+        )
+    # Everything else: PyTorch's own backend selection (flash / mem-efficient / math)
+    return _ORIG_SDPA(query, key, value, attn_mask, dropout_p, is_causal, **kwargs)
 
 
-def looks_like_obj_text(path: Path) -> bool:
-    """Heuristic: detect OBJ text saved with the wrong extension."""
+@contextlib.contextmanager
+def _sage_disabled():
+    """Plain SDPA inside the block: torch.onnx.export cannot trace the Triton sageattn kernels."""
+    global _SAGEATTN
+    saved, _SAGEATTN = _SAGEATTN, None
+    try:
+        yield
+    finally:
+        _SAGEATTN = saved
+
+
+def _use_sdpa_processors(model: torch.nn.Module) -> int:
+    """Switch diffusers Attention modules still on the classic (bmm + softmax) processor to SDPA."""
+    try:
+        from diffusers.models.attention_processor import AttnProcessor, AttnProcessor2_0
+    except ImportError:
+        return 0
+
+    swapped = 0
+    for m in model.modules():
+        if type(getattr(m, "processor", None)) is AttnProcessor:
+            m.set_processor(AttnProcessor2_0())
+            swapped += 1
+    return swapped
+
+
+def _install_sage_sdpa(model: torch.nn.Module) -> None:
+    """Route the attention calls of model through _sage_sdpa."""
+    torch.nn.functional.scaled_dot_product_attention = _sage_sdpa
+    for m in model.modules():
+        # Modules that imported the function directly ("from torch.nn.functional import ...")
+        mod = sys.modules.get(type(m).__module__)
+        if getattr(mod, "scaled_dot_product_attention", None) is _ORIG_SDPA:
+            mod.scaled_dot_product_attention = _sage_sdpa
+
+
+def enable_fast_attention(pipeline_shapegen, paint_pipeline, sage: bool = False) -> None:
+    """Use SDPA attention processors everywhere; optionally SageAttention inside the shape DiT."""
+    global _SAGEATTN
+
+    model = getattr(pipeline_shapegen, "model", None)
+    modules = [module for _, module in _paint_modules(paint_pipeline)]
+    if isinstance(model, torch.nn.Module):
+        modules.append(model)
+    swapped = sum(_use_sdpa_processors(module) for module in modules)
+    print(f"[OK] Attention: {swapped} diffusers processors switched to SDPA.")
+
+    if not sage:
+        return
+    try:
+        from sageattention import sageattn
+    except ImportError:
+        print("[WARN] --sage requested but sageattention is not installed, using SDPA.")
+        return
+    if not isinstance(model, torch.nn.Module):
+        print("[WARN] Shape DiT not found, --sage ignored.")
+        return
+
+    def _enter(*_):
+        global _SAGE_DEPTH
+        _SAGE_DEPTH += 1
+
+    def _leave(*_):
+        global _SAGE_DEPTH
+        _SAGE_DEPTH -= 1
+
+    _SAGEATTN = sageattn
+    _install_sage_sdpa(model)
+    model.register_forward_pre_hook(_enter)
+    model.register_forward_hook(_leave)
+    print("[OK] SageAttention enabled for the shape DiT.")
+
+
+def enable_torch_compile(pipeline_shapegen, paint_pipeline) -> None:
+    """
+    torch.compile (CUDA graphs via mode="reduce-overhead") the shape DiT and the paint UNet/VAE.
+    Shapes are static (RESOLUTION / MAX_NUM_VIEW), so each graph is captured once and reused.
+    Modules already replaced by TensorRT engines are left untouched.
+    """
+    def _compile(module):
+        return torch.compile(module, mode="reduce-overhead", fullgraph=False, dynamic=False)
+
+    model = getattr(pipeline_shapegen, "model", None)
+    if isinstance(model, torch.nn.Module) and not isinstance(model, TRTModule):
+        pipeline_shapegen.model = _compile(model)
+        print("[OK] Shape DiT compiled.")
+
+    owner = _paint_unet_owner(paint_pipeline)
+    unet = getattr(owner, "unet", None)
+    if isinstance(unet, torch.nn.Module) and not isinstance(unet, TRTModule):
+        owner.unet = _compile(unet)
+        print("[OK] Paint UNet compiled.")
+
+    # diffusers calls vae.encode()/vae.decode(), not forward(): compile the inner networks
+    vae = getattr(owner, "vae", None)
+    for name in ("encoder", "decoder"):
+        sub = getattr(vae, name, None)
+        if isinstance(sub, torch.nn.Module):
+            setattr(vae, name, _compile(sub))
+    if vae is not None:
+        print("[OK] Paint VAE compiled.")
+
+
+class TRTModule(torch.nn.Module):
+    """
+    Drop-in replacement for a torch submodule, backed by a TensorRT engine.
+
+    The first call runs the wrapped module eagerly and records the call structure. If no
+    cached .plan exists, the module is exported to ONNX with those exact (static) inputs and
+    built into an FP16 engine (a failed build leaves a .failed marker next to the plan and is
+    not retried). Later calls with the same structure/shapes run the engine on
+    pre-allocated CUDA output buffers; anything else (or any TRT error) falls back to torch.
+    """
+
+    def __init__(self, module: torch.nn.Module, plan_path: Path):
+        super().__init__()
+        self.module = module
+        self.plan_path = plan_path
+        self._ready = False
+        self._disabled = False
+        self._in_spec = None
+        self._in_consts = None
+        self._in_shapes = None
+        self._out_spec = None
+        self._out_dtypes = None
+        self._engine = None
+        self._context = None
+        self._inputs = []    # (engine tensor name, index into flat tensor inputs, torch dtype)
+        self._outputs = []   # (engine tensor name, pre-allocated buffer)
+
+    def __getattr__(self, name):
+        # Expose attributes of the wrapped module (dtype, device, config, ...)
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            return getattr(self._modules["module"], name)
+
+    _TENSOR = object()  # placeholder for tensor leaves in the recorded call structure
+
+    @classmethod
+    def _flatten(cls, args, kwargs):
+        leaves, spec = torch.utils._pytree.tree_flatten((args, kwargs))
+        tensors = [x for x in leaves if isinstance(x, torch.Tensor)]
+        consts = [cls._TENSOR if isinstance(x, torch.Tensor) else x for x in leaves]
+        return tensors, consts, spec
+
+    def forward(self, *args, **kwargs):
+        if self._disabled:
+            return self.module(*args, **kwargs)
+
+        tensors, consts, spec = self._flatten(args, kwargs)
+        if self._ready:
+            if (
+                spec == self._in_spec
+                and consts == self._in_consts
+                and [tuple(t.shape) for t in tensors] == self._in_shapes
+            ):
+                try:
+                    return self._run_engine(tensors)
+                except Exception as e:
+                    print(f"[WARN] TensorRT engine failed, using torch for {self.plan_path.name}: {e}")
+                    self._disabled = True
+            return self.module(*args, **kwargs)
+
+        out = self.module(*args, **kwargs)
+        try:
+            self._setup(tensors, consts, spec, args, kwargs, out)
+        except Exception as e:
+            print(f"[WARN] TensorRT disabled for {self.plan_path.name}: {e}")
+            self._disabled = True
+        return out
+
+    def _setup(self, tensors, consts, spec, args, kwargs, out):
+        # Inputs mutated in place (e.g. cache dicts) cannot be reproduced by a static engine
+        if self._flatten(args, kwargs)[2] != spec:
+            raise RuntimeError("module mutates its inputs")
+        out_leaves, out_spec = torch.utils._pytree.tree_flatten(out)
+        if not all(isinstance(x, torch.Tensor) for x in out_leaves):
+            raise RuntimeError("module returns non-tensor outputs")
+
+        if not self.plan_path.exists():
+            # A failed export/build is remembered, so later runs go straight to torch
+            failed_path = self.plan_path.with_suffix(".failed")
+            if failed_path.exists():
+                raise RuntimeError(f"engine build failed before (delete {failed_path} to retry)")
+            try:
+                self._build_plan(tensors, consts, spec)
+            except Exception as e:
+                failed_path.parent.mkdir(parents=True, exist_ok=True)
+                failed_path.write_text(f"{type(e).__name__}: {e}\n")
+                raise
+
+        import tensorrt as trt
+
+        runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        engine = runtime.deserialize_cuda_engine(self.plan_path.read_bytes())
+        if engine is None:
+            raise RuntimeError(f"could not deserialize {self.plan_path}")
+        context = engine.create_execution_context()
+
+        trt_to_torch = {
+            trt.float32: torch.float32,
+            trt.float16: torch.float16,
+            trt.int32: torch.int32,
+            trt.int64: torch.int64,
+            trt.bool: torch.bool,
+        }
+        device = out_leaves[0].device
+        inputs, outputs = [], {}
+        for i in range(engine.num_io_tensors):
+            name = engine.get_tensor_name(i)
+            dtype = trt_to_torch[engine.get_tensor_dtype(name)]
+            if engine.get_tensor_mode(name) == trt.TensorIOMode.INPUT:
+                # ONNX export may drop unused inputs, so map by name ("in_<index>")
+                idx = int(name.split("_", 1)[1])
+                if tuple(engine.get_tensor_shape(name)) != tuple(tensors[idx].shape):
+                    raise RuntimeError(f"engine input {name} has a different shape (stale plan?)")
+                inputs.append((name, idx, dtype))
+            else:
+                idx = int(name.split("_", 1)[1])
+                shape = tuple(context.get_tensor_shape(name))
+                outputs[idx] = (name, torch.empty(shape, dtype=dtype, device=device))
+
+        self._context = context
+        self._engine = engine
+        self._inputs = inputs
+        self._outputs = [outputs[i] for i in range(len(out_leaves))]
+        self._in_spec = spec
+        self._in_consts = consts
+        self._in_shapes = [tuple(t.shape) for t in tensors]
+        self._out_spec = out_spec
+        self._out_dtypes = [t.dtype for t in out_leaves]
+        self._ready = True
+        print(f"[OK] TensorRT engine active: {self.plan_path.name}")
+
+    def _build_plan(self, tensors, consts, spec):
+        import tensorrt as trt
+
+        module = self.module
+        placeholder = self._TENSOR
+
+        class _FlatModule(torch.nn.Module):
+            """Re-assembles the original (args, kwargs) from flat tensors for ONNX export."""
+
+            def __init__(self):
+                super().__init__()
+                self.module = module
+
+            def forward(self, *flat):
+                it = iter(flat)
+                leaves = [next(it) if c is placeholder else c for c in consts]
+                args, kwargs = torch.utils._pytree.tree_unflatten(leaves, spec)
+                return tuple(torch.utils._pytree.tree_leaves(self.module(*args, **kwargs)))
+
+        self.plan_path.parent.mkdir(parents=True, exist_ok=True)
+        onnx_path = self.plan_path.with_suffix(".onnx")
+        print(f"[INFO] Exporting ONNX for TensorRT (one-time): {onnx_path.name}")
+        with torch.inference_mode(False), torch.no_grad(), _sage_disabled():
+            example = tuple(t.detach().clone() for t in tensors)
+            flat_module = _FlatModule()
+            n_out = len(flat_module(*example))
+            torch.onnx.export(
+                flat_module,
+                example,
+                str(onnx_path),
+                input_names=[f"in_{i}" for i in range(len(example))],
+                output_names=[f"out_{i}" for i in range(n_out)],
+                opset_version=17,
+                do_constant_folding=True,
+            )
+
+        print(f"[INFO] Building TensorRT FP16 engine (one-time, may take minutes): {self.plan_path.name}")
+        logger = trt.Logger(trt.Logger.WARNING)
+        builder = trt.Builder(logger)
+        network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+        parser = trt.OnnxParser(network, logger)
+        if not parser.parse_from_file(str(onnx_path)):
+            errors = "; ".join(str(parser.get_error(i)) for i in range(parser.num_errors))
+            raise RuntimeError(f"ONNX parse failed: {errors}")
+        config = builder.create_builder_config()
+        config.set_flag(trt.BuilderFlag.FP16)
+        serialized = builder.build_serialized_network(network, config)
+        if serialized is None:
+            raise RuntimeError("TensorRT engine build failed")
+        self.plan_path.write_bytes(bytes(serialized))
+
+    def _run_engine(self, tensors):
+        # Keep cast/contiguous copies alive until the engine has been enqueued
+        feeds = []
+        for name, idx, dtype in self._inputs:
+            t = tensors[idx].to(dtype=dtype).contiguous()
+            feeds.append(t)
+            self._context.set_tensor_address(name, t.data_ptr())
+        for name, buf in self._outputs:
+            self._context.set_tensor_address(name, buf.data_ptr())
+        if not self._context.execute_async_v3(torch.cuda.current_stream().cuda_stream):
+            raise RuntimeError("execute_async_v3 returned False")
+        # The buffers are overwritten by the next call: hand out copies, never the buffers themselves
+        outs = [
+            buf.clone() if buf.dtype == dtype else buf.to(dtype)
+            for (_, buf), dtype in zip(self._outputs, self._out_dtypes)
+        ]
+        return torch.utils._pytree.tree_unflatten(outs, self._out_spec)
+
+
+def enable_tensorrt(pipeline_shapegen, paint_pipeline) -> None:
+    """Swap the shape DiT and the paint multiview UNet for lazily built TensorRT engines."""
+    try:
+        import tensorrt  # noqa: F401
+    except ImportError:
+        print("[WARN] --trt requested but tensorrt is not installed, running in PyTorch.")
+        return
+
+    cache_dir = SCRIPT_DIR / TRT_CACHE_DIRNAME
+    pipeline_shapegen.model = TRTModule(
+        pipeline_shapegen.model, cache_dir / f"shape_{MAX_NUM_VIEW}_{RESOLUTION}.plan"
+    )
+    owner = _paint_unet_owner(paint_pipeline)
+    if owner is not None and getattr(owner, "unet", None) is not None:
+        owner.unet = TRTModule(owner.unet, cache_dir / f"paint_{MAX_NUM_VIEW}_{RESOLUTION}.plan")
+    else:
+        print("[WARN] Paint multiview UNet not found, TensorRT only enabled for shape.")
+    print(f"[OK] TensorRT enabled (engine cache: {cache_dir})")
+
+
+class MeshFileKind(enum.Enum):
+    GLB = "glb"
+    OBJ_TEXT = "obj"
+    UNKNOWN = "unknown"
+
+
+def classify_mesh_file(path: Path) -> MeshFileKind:
+    """
+    Classify a mesh output from its first 64 bytes (single read):
+    GLB signature (b'glTF'), OBJ text saved with the wrong extension, or unknown.
+    """
     try:
         with path.open("rb") as f:
             head = f.read(64)
-        return (
-            (b"mtllib" in head)
-            or head.lstrip().startswith(b"#")
-            or head.lstrip().startswith(b"o ")
-            or head.lstrip().startswith(b"v ")
-        )
-    except Exception:
-        return False
+    except OSError:
+        return MeshFileKind.UNKNOWN
+    if head[:4] == b"glTF":
+        return MeshFileKind.GLB
+    stripped = head.lstrip()
+    if stripped[:1] == b"#" or stripped[:2] in (b"o ", b"v ") or b"mtllib" in head:
+        return MeshFileKind.OBJ_TEXT
+    return MeshFileKind.UNKNOWN
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
 
 def has_alpha_png(p: Path) -> bool:
-    """True if PNG likely contains alpha channel."""
+    """
+    True if PNG likely contains alpha channel.
+    Reads only the chunk headers before the image data (IHDR color type, tRNS presence);
+    falls back to PIL if the file can't be parsed that way.
+    """
     if p.suffix.lower() != ".png":
         return False
+    try:
+        with p.open("rb") as f:
+            if f.read(8) != _PNG_SIGNATURE:
+                raise ValueError("not a PNG signature")
+            length, chunk = struct.unpack(">I4s", f.read(8))
+            if chunk != b"IHDR" or length != 13:
+                raise ValueError("missing IHDR")
+            color_type = f.read(13)[9]
+            if color_type in (4, 6):  # grayscale + alpha, RGBA
+                return True
+            f.seek(4, os.SEEK_CUR)  # IHDR CRC
+            # tRNS (palette / color-key transparency) must appear before the first IDAT
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError("truncated PNG")
+                length, chunk = struct.unpack(">I4s", header)
+                if chunk == b"tRNS":
+                    return True
+                if chunk in (b"IDAT", b"IEND"):
+                    return False
+                f.seek(length + 4, os.SEEK_CUR)
+    except Exception:
+        return _has_alpha_png_pil(p)
+
+
+def _has_alpha_png_pil(p: Path) -> bool:
     try:
         im = Image.open(p)
         if im.mode in ("RGBA", "LA"):
@@ -105,9 +830,24 @@ def has_alpha_png(p: Path) -> bool:
         return False
 
 
+# BackgroundRemover (rembg ONNX Runtime session), created once and shared by every
+# remove_background_to_png call (prepare_input runs in worker threads, hence the lock)
+_REMBG_LOCK = threading.Lock()
+_REMBG = None
+
+
+def _get_rembg():
+    """Return the cached BackgroundRemover (weights are loaded once, not per image)."""
+    global _REMBG
+    with _REMBG_LOCK:
+        if _REMBG is None:
+            _REMBG = BackgroundRemover()
+        return _REMBG
+
+
 def remove_background_to_png(src: Path, dst_png: Path, force: bool = False) -> Path:
     """
-    Create an RGBA PNG with background removed using U^2-Net (via BackgroundRemover).
+    Create an RGBA PNG with background removed using U^2-Net (via a shared BackgroundRemover).
     If src is already a PNG with alpha and not force -> returns src.
     Otherwise saves dst_png and returns dst_png.
     """
@@ -120,13 +860,94 @@ def remove_background_to_png(src: Path, dst_png: Path, force: bool = False) -> P
     # Rembg path in hy3dshape expects RGB and outputs RGBA
     im_rgb = im.convert("RGB") if im.mode != "RGB" else im
 
-    rembg = BackgroundRemover()
-    out = rembg(im_rgb)  # returns PIL image with alpha
+    out = _get_rembg()(im_rgb)  # returns PIL image with alpha
     out = out.convert("RGBA")
     out.save(dst_png)
     return dst_png
 
 
+def _decode_image_rgba(path: Path):
+    """
+    Decode a JPEG/PNG with torchvision on the CPU (libjpeg-turbo / libpng) at full resolution and
+    return it as an RGBA PIL image (the pipelines' input type). Runs in the prefetch worker, so it
+    takes no GPU time or VRAM while the DiT/UNet is running.
+    No resizing here: both pipelines crop to the foreground first, then resize.
+    Returns None for formats that should go through PIL instead (.webp, .tif, ...).
+    """
+    suffix = path.suffix.lower()
+    if suffix not in (".png", ".jpg", ".jpeg"):
+        return None
+    try:
+        from torchvision.io import ImageReadMode, decode_jpeg, decode_png
+    except ImportError:
+        return None
+
+    data = torch.frombuffer(bytearray(path.read_bytes()), dtype=torch.uint8)
+    if suffix == ".png":
+        rgba = decode_png(data, mode=ImageReadMode.RGB_ALPHA)
+        if rgba.dtype != torch.uint8:  # 16-bit PNG
+            return None
+        return Image.fromarray(rgba.permute(1, 2, 0).contiguous().numpy(), "RGBA")
+
+    rgb = decode_jpeg(data, mode=ImageReadMode.RGB)
+    return Image.fromarray(rgb.permute(1, 2, 0).contiguous().numpy(), "RGB").convert("RGBA")
+
+
+def prepare_input(img_path: Path, output_dir: Path, remove_bg: bool, force_remove: bool):
+    """
+    Load one input image as RGBA (optionally removing the background first).
+    Runs in a worker thread; returns (path used as model input, decoded RGBA image).
+    """
+    input_for_model = img_path
+    if remove_bg:
+        # Generate a transparent PNG in the per-image output folder
+        per_item_dir = (output_dir / img_path.stem).resolve()
+        per_item_dir.mkdir(parents=True, exist_ok=True)
+        bg_png = per_item_dir / f"{img_path.stem}_bgremoved.png"
+        input_for_model = remove_background_to_png(img_path, bg_png, force=force_remove)
+
+    return input_for_model, _load_for_pipeline(Path(input_for_model))
+
+
+def _load_for_pipeline(path: Path) -> Image.Image:
+    """Decode an input image as RGBA: torchvision (libjpeg-turbo / libpng) when possible, PIL otherwise."""
+    try:
+        image = _decode_image_rgba(path)
+    except Exception as e:
+        print(f"[WARN] torchvision decode failed for {path.name}, using PIL: {e}")
+        image = None
+    if image is not None:
+        return image
+
+    image = Image.open(path)
+    image.load()  # decode here, not lazily on the GPU thread
+    # Ensure RGBA (shape + paint behave best with consistent RGBA input)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    return image
+
+
+def finalize_textured_output(out_glb_maybe: Path, per_item_dir: Path, stem: str):
+    """
+    Fix wrong extension: if the paint output is OBJ text saved as .glb, rename it to .obj.
+    Returns the final textured mesh path (None if paint produced nothing).
+    """
+    if not out_glb_maybe.exists():
+        print("[WARN] output_mesh_path not found after paint. Check logs in this folder.")
+        return None
+    kind = classify_mesh_file(out_glb_maybe)
+    if kind is MeshFileKind.GLB:
+        print(f"[OK] Textured GLB exported: {out_glb_maybe.name}")
+    elif kind is MeshFileKind.OBJ_TEXT:
+        out_obj = per_item_dir / f"{stem}_textured.obj"
+        out_glb_maybe.replace(out_obj)
+        print(f"[FIX] Output was OBJ text, renamed to: {out_obj.name}")
+        return out_obj
+    else:
+        print(f"[WARN] Output exists but is not valid GLB and doesn't look like OBJ: {out_glb_maybe.name}")
+    return out_glb_maybe
+
+
 def collect_images(input_dir: Path) -> list[Path]:
     """Collect supported image files from input_dir (non-recursive)."""
     exts = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
@@ -136,6 +957,233 @@ def collect_images(input_dir: Path) -> list[Path]:
     ]
 
 
+def load_pipelines(use_cache: bool = False):
+    """
+    Build the shape and paint pipelines.
+    With use_cache, the freshly built pipelines are pickled to ./cache once and later runs
+    memory-map them back instead of calling from_pretrained again. Each tensor returns to the
+    device it was saved from (the cache is written from the live pipelines, CPU parts included).
+    """
+    cache_path = SCRIPT_DIR / PIPELINE_CACHE_DIRNAME / f"pipes_{MAX_NUM_VIEW}_{RESOLUTION}.pt"
+    if use_cache and cache_path.is_file():
+        try:
+            print(f"[INFO] Loading cached pipelines: {cache_path}")
+            pipes = torch.load(cache_path, mmap=True, weights_only=False)
+            if pipes.get("model_path") == MODEL_PATH:
+                return pipes["shape"], pipes["paint"]
+            print("[WARN] Pipeline cache was built from another MODEL_PATH, rebuilding.")
+        except Exception as e:
+            print(f"[WARN] Could not load pipeline cache, rebuilding: {e}")
+
+    print(f"[INFO] Loading shape model from: {MODEL_PATH}")
+    pipeline_shapegen = Hunyuan3DDiTFlowMatchingPipeline.from_pretrained(MODEL_PATH)
+
+    conf = Hunyuan3DPaintConfig(MAX_NUM_VIEW, RESOLUTION)
+    conf.realesrgan_ckpt_path = str((HY3DPAINT_DIR / "ckpt" / "RealESRGAN_x4plus.pth").resolve())
+    conf.multiview_cfg_path = str((HY3DPAINT_DIR / "cfgs" / "hunyuan-paint-pbr.yaml").resolve())
+    conf.custom_pipeline = str((HY3DPAINT_DIR / "hunyuanpaintpbr").resolve())
+
+    print("[INFO] Loading paint pipeline...")
+    paint_pipeline = Hunyuan3DPaintPipeline(conf)
+
+    if use_cache:
+        tmp_path = cache_path.with_suffix(".tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            torch.save(
+                {"model_path": MODEL_PATH, "shape": pipeline_shapegen, "paint": paint_pipeline},
+                tmp_path,
+            )
+            tmp_path.replace(cache_path)
+            print(f"[OK] Pipelines cached: {cache_path}")
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"[WARN] Could not cache pipelines (continuing without cache): {e}")
+
+    return pipeline_shapegen, paint_pipeline
+
+
+# Profiler events that block the CPU until the GPU catches up
+_SYNC_EVENTS = ("aten::_local_scalar_dense", "cudaStreamSynchronize", "cudaDeviceSynchronize")
+
+
+@contextlib.contextmanager
+def profile_syncs(trace_path: Path):
+    """Profile the enclosed block and report CPU<->GPU sync points (.item(), .cpu(), ...) by call site."""
+    from torch.profiler import ProfilerActivity, profile
+
+    with profile(activities=[ProfilerActivity.CPU, ProfilerActivity.CUDA], with_stack=True) as prof:
+        yield
+    prof.export_chrome_trace(str(trace_path))
+
+    syncs = [e for e in prof.key_averages(group_by_stack_n=4) if e.key in _SYNC_EVENTS]
+    print(f"[INFO] CPU<->GPU syncs: {sum(e.count for e in syncs)} (trace: {trace_path})")
+    for e in sorted(syncs, key=lambda e: e.count, reverse=True)[:10]:
+        site = " <- ".join(e.stack[:2]) if e.stack else "?"
+        print(f"    {e.count:6d}x {e.key}  {site}")
+
+
+def configure_torch_backends() -> None:
+    """Global TF32 / cuDNN settings; call before the pipelines are loaded."""
+    # fp32 matmuls and convs run on Tensor Cores as TF32 (Ampere+)
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+    # Inputs have fixed shapes (RESOLUTION / MAX_NUM_VIEW): let cuDNN autotune once and reuse
+    torch.backends.cudnn.benchmark = True
+
+
+def setup_pipelines(args):
+    """Load both pipelines and apply the requested acceleration options."""
+    pipeline_shapegen, paint_pipeline = load_pipelines(use_cache=args.cache_pipelines)
+
+    enable_fp16_channels_last(pipeline_shapegen, paint_pipeline)
+    if args.quant:
+        quantize_paint_unet(paint_pipeline, args.quant)
+    enable_fast_attention(pipeline_shapegen, paint_pipeline, sage=args.sage)
+
+    if args.trt:
+        enable_tensorrt(pipeline_shapegen, paint_pipeline)
+    if args.compile:
+        enable_torch_compile(pipeline_shapegen, paint_pipeline)
+    return pipeline_shapegen, paint_pipeline
+
+
+def process_images(images, output_dir: Path, pipeline_shapegen, paint_pipeline, args) -> list[dict]:
+    """
+    Run shape + paint on every image; outputs go to output_dir/<image stem>/.
+    Returns one dict per image: {"image", "shape", "textured", "error"} (paths as str or None).
+    """
+    results = {p: {"image": str(p), "shape": None, "textured": None, "error": None} for p in images}
+    finalized = []
+    profiled = False
+
+    # CPU-side work (image decode, background removal, output checks) runs in worker threads:
+    # image N+1 is prepared while image N is on the GPU.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        next_prepared = pool.submit(
+            prepare_input, images[0], output_dir, args.remove_bg, args.force_remove
+        )
+        for idx, img_path in enumerate(images):
+            stem = img_path.stem
+            per_item_dir = (output_dir / stem).resolve()
+            per_item_dir.mkdir(parents=True, exist_ok=True)
+
+            prepared = next_prepared
+            if idx + 1 < len(images):
+                next_prepared = pool.submit(
+                    prepare_input, images[idx + 1], output_dir, args.remove_bg, args.force_remove
+                )
+
+            print("\n" + "=" * 70)
+            print(f"[INFO] Processing: {img_path.name}")
+            print(f"[INFO] Output dir:  {per_item_dir}")
+
+            try:
+                input_for_model, image = prepared.result()
+                if args.remove_bg:
+                    print(f"[OK] BG removed -> {Path(input_for_model).name}")
+
+                # SHAPE
+                shape_glb = per_item_dir / f"{stem}_shape.glb"
+                with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16):
+                    mesh = pipeline_shapegen(image=image)[0]
+                mesh.export(str(shape_glb))
+                print(f"[OK] Shape exported: {shape_glb.name}")
+                results[img_path]["shape"] = str(shape_glb)
+
+                # PAINT
+                out_glb_maybe = per_item_dir / f"{stem}_textured.glb"
+                # Profile the first paint call only (--profile-sync)
+                profiler = contextlib.nullcontext()
+                if args.profile_sync and not profiled:
+                    profiler = profile_syncs(per_item_dir / f"{stem}_paint_profile.json")
+                    profiled = True
+
+                # No autocast here: rasterization / UV baking math must stay in fp32,
+                # the diffusion modules are already fp16.
+                with torch.inference_mode(), profiler:
+                    paint_pipeline(
+                        mesh_path=str(shape_glb),
+                        # Same decoded RGBA image as shape: no second open/decode
+                        image_path=image,
+                        output_mesh_path=str(out_glb_maybe),
+                    )
+
+                # Cached blocks are kept (no empty_cache): the next image reuses them.
+                # The first image's peak includes one-time warmup (autotune, compile, engines).
+                if torch.cuda.is_available():
+                    peak_gb = torch.cuda.max_memory_allocated() / 2**30
+                    print(f"[INFO] Peak VRAM: {peak_gb:.1f} GB")
+                    torch.cuda.reset_peak_memory_stats()
+
+                # Output checks/renames do not need the GPU: the next image starts right away
+                finalized.append(
+                    (img_path, pool.submit(finalize_textured_output, out_glb_maybe, per_item_dir, stem))
+                )
+
+            except Exception as e:
+                print(f"[ERROR] Failed on {img_path.name}: {e}")
+                results[img_path]["error"] = str(e)
+
+    for img_path, future in finalized:
+        try:
+            textured = future.result()
+        except Exception as e:
+            print(f"[ERROR] Output check failed on {img_path.name}: {e}")
+            results[img_path]["error"] = str(e)
+            continue
+        results[img_path]["textured"] = str(textured) if textured else None
+    return list(results.values())
+
+
+def serve(pipeline_shapegen, paint_pipeline, output_dir: Path, args) -> None:
+    """
+    Warm worker: keep the pipelines loaded and process requests from --submit clients.
+    Request:  {"image_path": "/abs/file.png", "output_dir": "/abs/dir" (optional)}
+    Response: {"ok": bool, "results": [...process_images dicts...], "error": str (if not ok)}
+    """
+    from multiprocessing.connection import Listener
+
+    socket_path = SCRIPT_DIR / SERVER_SOCKET_NAME
+    socket_path.unlink(missing_ok=True)
+    # Requests are unpickled: create the socket owner-only (0600)
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(str(socket_path), family="AF_UNIX")
+    finally:
+        os.umask(old_umask)
+
+    with listener:
+        print(f"[OK] Server ready on {socket_path} (Ctrl+C to stop)")
+        try:
+            while True:
+                with listener.accept() as conn:
+                    try:
+                        request = conn.recv()
+                        image_path = Path(request["image_path"]).expanduser().resolve()
+                        if not image_path.is_file():
+                            raise FileNotFoundError(f"image not found: {image_path}")
+                        item_output_dir = Path(request.get("output_dir") or output_dir).resolve()
+                        item_output_dir.mkdir(parents=True, exist_ok=True)
+                        results = process_images(
+                            [image_path], item_output_dir, pipeline_shapegen, paint_pipeline, args
+                        )
+                        response = {"ok": results[0]["error"] is None, "results": results}
+                    except Exception as e:
+                        print(f"[ERROR] Bad request: {e}")
+                        response = {"ok": False, "results": [], "error": str(e)}
+                    try:
+                        conn.send(response)
+                    except (OSError, EOFError) as e:
+                        # Client went away mid-job (e.g. Ctrl+C): outputs are on disk, keep serving
+                        print(f"[WARN] Could not reply to client: {e}")
+        except KeyboardInterrupt:
+            print("\n[INFO] Server stopped.")
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="ZetaLvX: Batch/single Hunyuan3D-2.1 shape + paint on images."
@@ -156,6 +1204,43 @@ def main():
         help="Force background removal even if the input is already a PNG with alpha."
     )
 
+    parser.add_argument(
+        "--trt",
+        action="store_true",
+        help="Run the shape DiT and paint UNet through TensorRT FP16 engines (built once, cached in ./trt_cache)."
+    )
+
+    parser.add_argument(
+        "--sage",
+        action="store_true",
+        help="Use SageAttention (if installed) for the shape DiT attention instead of PyTorch SDPA."
+    )
+
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="torch.compile the shape DiT and paint UNet/VAE with CUDA graphs (slow first image, faster after)."
+    )
+
+    parser.add_argument(
+        "--quant",
+        choices=("fp8", "int8"),
+        default=None,
+        help="Weight-only quantize the paint UNet with torchao (fp8 on Ada/Hopper, int8 on Ampere)."
+    )
+
+    parser.add_argument(
+        "--profile-sync",
+        action="store_true",
+        help="Profile the first paint call and list CPU<->GPU sync points (writes a Chrome trace)."
+    )
+
+    parser.add_argument(
+        "--cache-pipelines",
+        action="store_true",
+        help="Pickle the loaded pipelines to ./cache on first run and mmap-load them on later runs."
+    )
+
     # Single file mode
     parser.add_argument(
         "--path",
@@ -164,15 +1249,34 @@ def main():
         help="Process a single image file instead of scanning ./input/. Example: --path /abs/or/rel/file.png"
     )
 
+    # Warm worker mode
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Load the pipelines once and serve --submit requests (warm worker, no per-image startup cost)."
+    )
+    parser.add_argument(
+        "--submit",
+        type=str,
+        default=None,
+        metavar="IMAGE",
+        help="Send one image to a running --server and print the output paths."
+    )
+
     args = parser.parse_args()
 
+    if args.submit:  # normally handled before the heavy imports (top of the script)
+        sys.exit(run_submit(args.submit))
+
     input_dir = (SCRIPT_DIR / "input").resolve()
     output_dir = (SCRIPT_DIR / "output").resolve()
     input_dir.mkdir(parents=True, exist_ok=True)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Decide whether to process a single file or the whole input folder
-    if args.path:
+    if args.server:
+        images = []
+    elif args.path:
         single = Path(args.path).expanduser()
         if not single.is_absolute():
             single = (Path.cwd() / single).resolve()
@@ -183,84 +1287,21 @@ def main():
     else:
         images = collect_images(input_dir)
 
-    if not images:
+    if not images and not args.server:
         print(f"[INFO] No images found in: {input_dir}")
         print("[INFO] Put one or more images into ./input and run again, or use --path <file>.")
         return
 
-    # Load shape pipeline once (reused for all images)
-    print(f"[INFO] Loading shape model from: {MODEL_PATH}")
-    pipeline_shapegen = Hunyuan3DDiTFlowMatchingPipeline.from_pretrained(MODEL_PATH)
+    configure_torch_backends()
 
-    # Configure paint pipeline once (reused for all images)
-    conf = Hunyuan3DPaintConfig(MAX_NUM_VIEW, RESOLUTION)
-    conf.realesrgan_ckpt_path = str((HY3DPAINT_DIR / "ckpt" / "RealESRGAN_x4plus.pth").resolve())
-    conf.multiview_cfg_path = str((HY3DPAINT_DIR / "cfgs" / "hunyuan-paint-pbr.yaml").resolve())
-    conf.custom_pipeline = str((HY3DPAINT_DIR / "hunyuanpaintpbr").resolve())
-
-    print("[INFO] Loading paint pipeline...")
-    paint_pipeline = Hunyuan3DPaintPipeline(conf)
-
-    for img_path in images:
-        stem = img_path.stem
-        per_item_dir = (output_dir / stem).resolve()
-        per_item_dir.mkdir(parents=True, exist_ok=True)
-
-        print("\n" + "=" * 70)
-        print(f"[INFO] Processing: {img_path.name}")
-        print(f"[INFO] Output dir:  {per_item_dir}")
+    # Load both pipelines once (reused for all images)
+    pipeline_shapegen, paint_pipeline = setup_pipelines(args)
 
-        old_cwd = Path.cwd()
-        os.chdir(per_item_dir)
-
-        try:
-            # Optionally remove background and generate a transparent PNG in the output folder
-            input_for_model = img_path
-            if args.remove_bg:
-                bg_png = per_item_dir / f"{stem}_bgremoved.png"
-                input_for_model = remove_background_to_png(
-                    img_path, bg_png, force=args.force_remove
-                )
-                print(f"[OK] BG removed -> {Path(input_for_model).name}")
-
-            # Load image for shapegen
-            image = Image.open(input_for_model)
-
-            # Ensure RGBA (shape + paint behave best with consistent RGBA input)
-            if image.mode != "RGBA":
-                image = image.convert("RGBA")
-
-            # SHAPE
-            shape_glb = per_item_dir / f"{stem}_shape.glb"
-            mesh = pipeline_shapegen(image=image)[0]
-            mesh.export(str(shape_glb))
-            print(f"[OK] Shape exported: {shape_glb.name}")
-
-            # PAINT
-            out_glb_maybe = per_item_dir / f"{stem}_textured.glb"
-            paint_pipeline(
-                mesh_path=str(shape_glb),
-                image_path=str(input_for_model),
-                output_mesh_path=str(out_glb_maybe),
-            )
-
-            # Fix wrong extension: if it's OBJ text saved as .glb, rename to .obj
-            if out_glb_maybe.exists():
-                if is_valid_glb(out_glb_maybe):
-                    print(f"[OK] Textured GLB exported: {out_glb_maybe.name}")
-                elif looks_like_obj_text(out_glb_maybe):
-                    out_obj = per_item_dir / f"{stem}_textured.obj"
-                    out_glb_maybe.replace(out_obj)
-                    print(f"[FIX] Output was OBJ text, renamed to: {out_obj.name}")
-                else:
-                    print(f"[WARN] Output exists but is not valid GLB and doesn't look like OBJ: {out_glb_maybe.name}")
-            else:
-                print("[WARN] output_mesh_path not found after paint. Check logs in this folder.")
+    if args.server:
+        serve(pipeline_shapegen, paint_pipeline, output_dir, args)
+        return
 
-        except Exception as e:
-            print(f"[ERROR] Failed on {img_path.name}: {e}")
-        finally:
-            os.chdir(old_cwd)
+    process_images(images, output_dir, pipeline_shapegen, paint_pipeline, args)
 
     print("\n[DONE] Completed.")
     print(f"[INFO] Outputs in: {output_dir}")